@@ -22,6 +22,32 @@ pub struct ReportLine {
     pub node_names: Vec<String>,
 }
 
+/// What a single node adds to each line it is counted in
+struct NodeContribution {
+    total_cpus: u32,
+    alloc_cpus: u32,
+    idle_cpus: u32,
+    total_gpus: u64,
+    alloc_gpus: u64,
+    idle_gpus: u64,
+}
+
+impl ReportLine {
+    /// Folds one node's contribution into this line, listing it under `name` if given
+    fn add(&mut self, contribution: &NodeContribution, name: Option<&String>) {
+        self.node_count += 1;
+        self.total_cpus += contribution.total_cpus;
+        self.alloc_cpus += contribution.alloc_cpus;
+        self.idle_cpus += contribution.idle_cpus;
+        self.total_gpus += contribution.total_gpus;
+        self.alloc_gpus += contribution.alloc_gpus;
+        self.idle_gpus += contribution.idle_gpus;
+        if let Some(name) = name {
+            self.node_names.push(name.clone());
+        }
+    }
+}
+
 /// Represents a top-level group in the report, categorized by a `NodeState`
 ///
 /// For example, this would hold all the data for the "IDLE" or "MIXED" sections
@@ -65,35 +91,27 @@ pub fn build_report(
 ) -> ReportData {
     let mut report_data = ReportData::new();
 
-    // creates a new Vec<u32> where each element corresponds to a node in the input `n` slice
-    let alloc_cpus_per_node: Vec<u32> = nodes
-        .iter()
-        .map(|&node| {
-            // for each node, look up its job IDs, returning an option
-            node_to_job_map
-                .get(&node.id)
-                // if the Option is Some(job_ids), we map over it to perform the calculation
-                .map(|job_ids| {
-                    job_ids
-                        .iter()
-                        // for each job_id, look up the job details. filter_map unwraps the Some results
-                        .filter_map(|job_id| jobs.jobs.get(job_id))
-                        // for each valid job, calculate the CPUs allocated to this specific node
-                        .map(|job| {
-                            if job.num_nodes > 0 {
-                                job.num_cpus / job.num_nodes
-                            } else {
-                                job.num_cpus // should not happen, but handles malformed job data
-                            }
-                        })
-                        .sum() // sum the CPUs for all jobs on this node
-                })
-                // if the initial .get() returned None (no jobs on the node), default to 0
-                .unwrap_or(0)
-        })
-        .collect(); // collect all the results into our vector
+    for &node in nodes {
+        // for each node, look up its job IDs and calculate the CPUs allocated to this specific
+        // node, defaulting to 0 if there are no jobs on it
+        let alloc_cpus_for_node: u32 = node_to_job_map
+            .get(&node.id)
+            .map(|job_ids| {
+                job_ids
+                    .iter()
+                    // for each job_id, look up the job details. filter_map unwraps the Some results
+                    .filter_map(|job_id| jobs.jobs.get(job_id))
+                    .map(|job| {
+                        if job.num_nodes > 0 {
+                            job.num_cpus / job.num_nodes
+                        } else {
+                            job.num_cpus // should not happen, but handles malformed job data
+                        }
+                    })
+                    .sum() // sum the CPUs for all jobs on this node
+            })
+            .unwrap_or(0);
 
-    for (node, &alloc_cpus_for_node) in nodes.iter().zip(alloc_cpus_per_node.iter()) {
         // slurm does not mark nodes as mixed by default, so we have to do it
         let derived_state = if alloc_cpus_for_node > 0 && alloc_cpus_for_node < node.cpus as u32 {
             match &node.state {
@@ -108,21 +126,6 @@ pub fn build_report(
             node.state.clone()
         };
 
-        // get the report group for the node's derived state
-        let group = report_data.entry(derived_state.clone()).or_default();
-
-        // update the main summary line for the group
-        group.summary.node_count += 1;
-        group.summary.total_cpus += node.cpus as u32;
-        group.summary.alloc_cpus += alloc_cpus_for_node;
-        if show_node_names {
-            group.summary.node_names.push(node.name.clone());
-        }
-        if let Some(gpu) = &node.gpu_info {
-            group.summary.total_gpus += gpu.total_gpus;
-            group.summary.alloc_gpus += gpu.allocated_gpus;
-        }
-
         // determine this node's contribution to idle resources
         let (idle_cpus_for_node, idle_gpus_for_node) = if !allocated {
             let base_state = match &derived_state {
@@ -149,44 +152,34 @@ pub fn build_report(
             (0, 0)
         };
 
-        // add the calculated idle resources to the summary totals
-        group.summary.idle_cpus += idle_cpus_for_node;
-        group.summary.idle_gpus += idle_gpus_for_node;
-
-        // update subgroups (gpu or feature)
-        if let Some(gpu) = &node.gpu_info {
-            let subgroup_key = if !verbose && gpu.name.starts_with("gpu:") {
-                "gpu".to_string()
-            } else {
-                gpu.name.clone()
-            };
-
-            let subgroup_line = group.subgroups.entry(subgroup_key).or_default();
-
-            subgroup_line.node_count += 1;
-            subgroup_line.total_cpus += node.cpus as u32;
-            subgroup_line.alloc_cpus += alloc_cpus_for_node;
-            subgroup_line.total_gpus += gpu.total_gpus;
-            subgroup_line.alloc_gpus += gpu.allocated_gpus;
-            if show_node_names {
-                subgroup_line.node_names.push(node.name.clone());
-            }
+        // everything this node adds, worked out once for both lines it is counted in
+        let contribution = NodeContribution {
+            total_cpus: node.cpus as u32,
+            alloc_cpus: alloc_cpus_for_node,
+            idle_cpus: idle_cpus_for_node,
+            total_gpus: node.gpu_info.as_ref().map_or(0, |gpu| gpu.total_gpus),
+            alloc_gpus: node.gpu_info.as_ref().map_or(0, |gpu| gpu.allocated_gpus),
+            idle_gpus: idle_gpus_for_node,
+        };
+        let name = show_node_names.then_some(&node.name);
 
-            // add this node's idle contribution to the subgroup
-            subgroup_line.idle_cpus += idle_cpus_for_node;
-            subgroup_line.idle_gpus += idle_gpus_for_node;
-        } else if let Some(feature) = node.features.first() {
-            let subgroup_line = group.subgroups.entry(feature.clone()).or_default();
-
-            subgroup_line.node_count += 1;
-            subgroup_line.total_cpus += node.cpus as u32;
-            subgroup_line.alloc_cpus += alloc_cpus_for_node;
-            if show_node_names {
-                subgroup_line.node_names.push(node.name.clone());
-            }
+        // the subgroup the node is counted under: its gpu, or failing that its first feature
+        let subgroup_key = match &node.gpu_info {
+            Some(gpu) if !verbose && gpu.name.starts_with("gpu:") => Some("gpu".to_string()),
+            Some(gpu) => Some(gpu.name.clone()),
+            None => node.features.first().cloned(),
+        };
 
-            // add this node's idle contribution to the subgroup
-            subgroup_line.idle_cpus += idle_cpus_for_node;
+        // get the report group for the node's derived state, and update its main summary line
+        // along with the subgroup
+        let group = report_data.entry(derived_state).or_default();
+        group.summary.add(&contribution, name);
+        if let Some(subgroup_key) = subgroup_key {
+            group
+                .subgroups
+                .entry(subgroup_key)
+                .or_default()
+                .add(&contribution, name);
         }
     }
     report_data
@@ -441,28 +434,33 @@ pub fn print_report(
     .cloned()
     .collect();
 
-    // sorts the states for presentation order
+    // sorts the states for presentation order, working out each state's key only once rather
+    // than on both sides of every comparison
     let mut sorted_states: Vec<&NodeState> = report_data.keys().collect();
-    sorted_states.sort_by(|a, b| {
-        let to_key = |state: &&NodeState| {
-            let (base_state, flags) = match state {
-                NodeState::Compound { base, flags } => (base.as_ref(), flags),
-                _ => (*state, &Vec::new()), // Treat simple state as having no flags
-            };
-            let base_priority = *state_order.get(base_state).unwrap_or(&99);
-
-            let mut flag_priorities: Vec<usize> = flags
-                .iter()
-                .map(|f| *flag_order.get(f.to_uppercase().as_str()).unwrap_or(&99))
-                .collect();
-            flag_priorities.sort_unstable(); // Sort by priority numbers for canonical comparison
-
-            (base_priority, flag_priorities)
+    sorted_states.sort_by_cached_key(|state| {
+        let (base_state, flags) = match state {
+            NodeState::Compound { base, flags } => (base.as_ref(), flags),
+            _ => (*state, &Vec::new()), // Treat simple state as having no flags
         };
+        let base_priority = *state_order.get(base_state).unwrap_or(&99);
+
+        let mut flag_priorities: Vec<usize> = flags
+            .iter()
+            .map(|f| *flag_order.get(f.to_uppercase().as_str()).unwrap_or(&99))
+            .collect();
+        flag_priorities.sort_unstable(); // Sort by priority numbers for canonical comparison
 
-        to_key(a).cmp(&to_key(b))
+        (base_priority, flag_priorities)
     });
 
+    // the same subgroups recur under most states, so they are put in order once for all of them
+    let mut sorted_subgroups: Vec<&String> = report_data
+        .values()
+        .flat_map(|group| group.subgroups.keys())
+        .collect();
+    sorted_subgroups.sort_unstable();
+    sorted_subgroups.dedup();
+
     // print headers
 
     let state_header = "STATE";
@@ -533,10 +531,7 @@ pub fn print_report(
                 },
             );
 
-            let mut sorted_subgroups: Vec<&String> = group.subgroups.keys().collect();
-            sorted_subgroups.sort();
-
-            for subgroup_name in sorted_subgroups {
+            for &subgroup_name in &sorted_subgroups {
                 if let Some(line) = group.subgroups.get(subgroup_name) {
                     let state_comp = StateComponent::new(
                         format!("  {}", subgroup_name),
@@ -628,18 +623,16 @@ fn print_utilization_bars(
         }
     } else {
         // --- Availability ---
+        let (available_nodes, available_cpus, available_gpus) = get_available(report_data);
         if total_line.node_count > 0 {
-            let available_nodes = get_available_nodes(report_data);
             let percent = (available_nodes as f64 / total_line.node_count as f64) * 100.0;
             print_utilization(percent, 50, BarColor::Green, "Node", no_color, allocated);
         }
         if total_line.total_cpus > 0 {
-            let available_cpus = get_available_cpus(report_data);
             let percent = (available_cpus as f64 / total_line.total_cpus as f64) * 100.0;
             print_utilization(percent, 50, BarColor::Cyan, "CPU", no_color, allocated);
         }
         if total_line.total_gpus > 0 {
-            let available_gpus = get_available_gpus(report_data);
             let percent = (available_gpus as f64 / total_line.total_gpus as f64) * 100.0;
             print_utilization(percent, 50, BarColor::Red, "GPU", no_color, allocated);
         }
@@ -667,36 +660,19 @@ fn is_node_available(state: &NodeState) -> bool {
     }
 }
 
-fn get_available_nodes(report_data: &ReportData) -> u32 {
-    report_data.iter().fold(0, |acc, (state, group)| {
-        if is_node_available(state) {
-            acc + group.summary.node_count
-        } else {
-            acc
-        }
-    })
-}
-
-/// Gets the total number of CPUs on nodes that are available to run jobs.
-fn get_available_cpus(report_data: &ReportData) -> u32 {
-    report_data.iter().fold(0, |acc, (state, group)| {
-        if is_node_available(state) {
-            acc + group.summary.total_cpus
-        } else {
-            acc
-        }
-    })
-}
-
-/// Gets the total number of GPUs on nodes that are available to run jobs.
-fn get_available_gpus(report_data: &ReportData) -> u64 {
-    report_data.iter().fold(0, |acc, (state, group)| {
-        if is_node_available(state) {
-            acc + group.summary.total_gpus
-        } else {
-            acc
-        }
-    })
+/// Gets the number of nodes that are available to run jobs, and the CPUs and GPUs on them,
+/// in one pass over the states.
+fn get_available(report_data: &ReportData) -> (u32, u32, u64) {
+    report_data
+        .iter()
+        .filter(|(state, _)| is_node_available(state))
+        .fold((0, 0, 0), |(nodes, cpus, gpus), (_, group)| {
+            (
+                nodes + group.summary.node_count,
+                cpus + group.summary.total_cpus,
+                gpus + group.summary.total_gpus,
+            )
+        })
 }
 
 #[derive(Clone)]
@@ -1,6 +1,6 @@
 use crate::PreemptJobs;
 use colored::*;
-use fi_slurm::filter::FeatureQuery;
+use fi_slurm::filter::{Alternative, FeatureQuery};
 use fi_slurm::jobs::{Job, SlurmJobs};
 use fi_slurm::nodes::{Node, NodeState};
 use fi_slurm::utils::count_blocks;
@@ -261,6 +261,14 @@ pub fn build_tree_report(
         root.single_filter = true
     };
 
+    // loop invariants, settled once rather than for every node
+    let hidden = hidden_features();
+    let labels: Vec<String> = selection
+        .alternatives()
+        .iter()
+        .map(Alternative::label)
+        .collect();
+
     // the main loop, iterating over the nodes in order to construct the tree structure
     for &node in nodes {
         let jobs_on_node = node_to_job_map
@@ -279,7 +287,7 @@ pub fn build_tree_report(
         } else {
             node.features
                 .iter()
-                .filter(|f| !hidden_features().contains(f.as_str()))
+                .filter(|f| !hidden.contains(f.as_str()))
                 .collect()
         };
 
@@ -290,11 +298,7 @@ pub fn build_tree_report(
             // by default, build tree from the (potentially filtered) feature list
             let mut current_level = &mut root;
             for feature in &features_for_tree {
-                current_level = current_level
-                    .children
-                    .entry(feature.to_string())
-                    .or_default();
-                current_level.name = feature.to_string();
+                current_level = child(current_level, feature);
                 current_level.stats.add(&contribution);
 
                 if show_node_names {
@@ -304,13 +308,11 @@ pub fn build_tree_report(
         } else {
             // bring what was selected to the top level, one branch per alternative, so that
             // a compound like icelake&gpu is one branch rather than one per feature in it
-            for alternative in selection.alternatives() {
+            for (alternative, label) in selection.alternatives().iter().zip(&labels) {
                 // IMPORTANT: The check to see if a node belongs under a filter
                 // must use the ORIGINAL, unfiltered features.
                 if alternative.matches(node, exact_match) {
-                    let label = alternative.label();
-                    let mut current_level = root.children.entry(label.clone()).or_default();
-                    current_level.name = label;
+                    let mut current_level = child(&mut root, label);
                     current_level.stats.add(&contribution);
 
                     // build the sub-branch from the *remaining* features,
@@ -320,11 +322,7 @@ pub fn build_tree_report(
                         .iter()
                         .filter(|f| !named.iter().any(|name| name == **f))
                     {
-                        current_level = current_level
-                            .children
-                            .entry(feature.to_string())
-                            .or_default();
-                        current_level.name = feature.to_string();
+                        current_level = child(current_level, feature);
                         current_level.stats.add(&contribution);
 
                         if show_node_names {
@@ -351,6 +349,23 @@ pub fn build_tree_report(
     root
 }
 
+/// The child of `parent` named `name`, created empty if there is none yet
+///
+/// Looks the child up by reference, so that only a new level pays for an owned copy of its name.
+fn child<'t>(parent: &'t mut TreeNode, name: &str) -> &'t mut TreeNode {
+    if !parent.children.contains_key(name) {
+        let level = TreeNode {
+            name: name.to_string(),
+            ..Default::default()
+        };
+        parent.children.insert(name.to_string(), level);
+    }
+    parent
+        .children
+        .get_mut(name)
+        .expect("the child was inserted above")
+}
+
 /// Makes a line report a preempt count even when nothing on it is preemptable
 fn seed_preempt_counts(stats: &mut ReportLine) {
     stats.preempt_nodes.get_or_insert(0);
@@ -1,11 +1,10 @@
 use colored::Colorize;
 use fi_slurm::assoc_mgr::{QosLimits, load as load_assoc_mgr};
-use fi_slurm::parser::parse_slurm_hostlist;
 use fi_slurm::partitions::get_partitions;
 use fi_slurm::{
     jobs::{
-        AccountJobUsage, AcctUsageWidths, FilterMethod, JobState, SlurmJobs, build_node_to_job_map,
-        get_jobs, print_accounts,
+        AccountJobUsage, AcctUsageWidths, FilterMethod, JobState, build_node_to_job_map,
+        enrich_jobs_with_node_ids, get_jobs, print_accounts,
     },
     nodes::get_nodes,
 };
@@ -305,27 +304,3 @@ pub fn leaderboard_feature(top_n: usize, features: Vec<String>) {
         );
     }
 }
-
-pub fn enrich_jobs_with_node_ids(slurm_jobs: &mut SlurmJobs, name_to_id: &HashMap<String, usize>) {
-    // iterate mutably over the jobs vector
-    for job in &mut slurm_jobs.jobs.values_mut() {
-        if job.raw_hostlist.is_empty() {
-            continue;
-        }
-
-        // parse the hostlist string
-        let expanded_nodes = parse_slurm_hostlist(&job.raw_hostlist);
-
-        // convert names to IDs and populate the job's node_ids vector
-        job.node_ids.reserve(expanded_nodes.len());
-        for node_name in expanded_nodes {
-            if let Some(&id) = name_to_id.get(&node_name) {
-                job.node_ids.push(id);
-            }
-        }
-
-        // free the memory from the raw string if it's no longer needed.
-        job.raw_hostlist.clear();
-        job.raw_hostlist.shrink_to_fit();
-    }
-}
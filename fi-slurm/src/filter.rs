@@ -1,5 +1,5 @@
 use crate::nodes::{Node, SlurmNodes};
-use std::collections::HashSet;
+use std::collections::{HashMap, HashSet};
 
 /// The characters Slurm reads as "and" in a feature expression: `&` between the terms of a
 /// `--constraint`, `,` between the features a node declares.
@@ -9,6 +9,140 @@ const OR: char = '|';
 /// Slurm's counted and bracketed constraints exist to shape an allocation, so they mean
 /// nothing when the job is to pick nodes to look at
 const ALLOCATION_ONLY: [char; 5] = ['[', ']', '*', '(', ')'];
+/// The fewest nodes worth handing a thread of their own. Looking up a feature costs about 20ns
+/// a node by exact match and 150ns by substring, against about 15µs to start and join a
+/// thread, so a run this long keeps the start-up cost to a few percent even for exact matches
+const MIN_NODES_PER_WORKER: usize = 32_768;
+
+/// Whether a node declaring `features` has `wanted`, by substring unless `exact`
+fn holds(features: &[String], wanted: &str, exact: bool) -> bool {
+    if exact {
+        features.iter().any(|held| held == wanted)
+    } else {
+        features.iter().any(|held| held.contains(wanted))
+    }
+}
+
+/// One set per feature in `named`, of the nodes in `nodes` holding it, by substring unless
+/// `exact`, with the nodes shared among up to `workers` threads, one run of nodes each
+fn look_up<N: Sync>(
+    named: &[&str],
+    nodes: &[N],
+    features_of: &(impl Fn(&N) -> &[String] + Sync),
+    exact: bool,
+    workers: usize,
+) -> Vec<NodeSet> {
+    let look_up_run = |run: &[N]| -> Vec<NodeSet> {
+        let mut sets = vec![NodeSet::empty(run.len()); named.len()];
+        for (index, node) in run.iter().enumerate() {
+            let features = features_of(node);
+            for (wanted, set) in named.iter().zip(&mut sets) {
+                if holds(features, wanted, exact) {
+                    set.insert(index);
+                }
+            }
+        }
+        sets
+    };
+
+    if workers <= 1 || nodes.is_empty() {
+        return look_up_run(nodes);
+    }
+
+    // every run but the last is a whole number of words long, so each feature's sets from the
+    // runs join end to end
+    let run_len = nodes.len().div_ceil(workers).next_multiple_of(64);
+    let look_up_run = &look_up_run;
+    let runs: Vec<Vec<NodeSet>> = std::thread::scope(|scope| {
+        let handles: Vec<_> = nodes
+            .chunks(run_len)
+            .map(|run| scope.spawn(move || look_up_run(run)))
+            .collect();
+        handles
+            .into_iter()
+            .map(|handle| {
+                handle
+                    .join()
+                    .unwrap_or_else(|panic| std::panic::resume_unwind(panic))
+            })
+            .collect()
+    });
+    (0..named.len())
+        .map(|feature| NodeSet {
+            words: runs
+                .iter()
+                .flat_map(|run| &run[feature].words)
+                .copied()
+                .collect(),
+        })
+        .collect()
+}
+
+/// A set of nodes, one bit per position in a node list
+///
+/// Lets a selection be evaluated for 64 nodes at a time rather than node by node.
+#[derive(Debug, Clone, PartialEq, Eq)]
+struct NodeSet {
+    words: Vec<u64>,
+}
+
+impl NodeSet {
+    /// A set with room for `len` nodes, none of them in it
+    fn empty(len: usize) -> Self {
+        Self {
+            words: vec![0; len.div_ceil(64)],
+        }
+    }
+
+    /// A set with room for `len` nodes, all of them in it
+    fn full(len: usize) -> Self {
+        let mut words = vec![u64::MAX; len.div_ceil(64)];
+        // leave the positions past the end of a partial last word out of the set
+        if !len.is_multiple_of(64) {
+            words[len / 64] = (1 << (len % 64)) - 1;
+        }
+        Self { words }
+    }
+
+    fn count(&self) -> usize {
+        self.words
+            .iter()
+            .map(|word| word.count_ones() as usize)
+            .sum()
+    }
+
+    fn insert(&mut self, index: usize) {
+        self.words[index / 64] |= 1 << (index % 64);
+    }
+
+    fn intersect_with(&mut self, other: &NodeSet) {
+        for (word, other) in self.words.iter_mut().zip(&other.words) {
+            *word &= other;
+        }
+    }
+
+    fn union_with(&mut self, other: &NodeSet) {
+        for (word, other) in self.words.iter_mut().zip(&other.words) {
+            *word |= other;
+        }
+    }
+
+    /// The positions in the set, in ascending order
+    fn iter(&self) -> impl Iterator<Item = usize> + '_ {
+        self.words.iter().enumerate().flat_map(|(i, &word)| {
+            let mut rest = word;
+            std::iter::from_fn(move || {
+                if rest == 0 {
+                    return None;
+                }
+                let bit = rest.trailing_zeros() as usize;
+                // clear the lowest set bit
+                rest &= rest - 1;
+                Some(i * 64 + bit)
+            })
+        })
+    }
+}
 
 /// One way a node can satisfy a selection: a node must have every feature named here.
 #[derive(Debug, Clone, PartialEq, Eq)]
@@ -19,13 +153,9 @@ pub struct Alternative {
 impl Alternative {
     /// Whether `node` has all of these features, by substring unless `exact`
     pub fn matches(&self, node: &Node, exact: bool) -> bool {
-        self.features.iter().all(|wanted| {
-            if exact {
-                node.features.contains(wanted)
-            } else {
-                node.features.iter().any(|held| held.contains(wanted))
-            }
-        })
+        self.features
+            .iter()
+            .all(|wanted| holds(&node.features, wanted, exact))
     }
 
     /// How to name this alternative in a report, in the syntax it was written in
@@ -95,6 +225,80 @@ impl FeatureQuery {
             .iter()
             .any(|alternative| alternative.matches(node, exact))
     }
+
+    /// The positions of the nodes in `nodes` that satisfy any alternative, reading each node's
+    /// features with `features_of`.
+    ///
+    /// Each feature named in the selection is looked up once per node, into a set of the nodes
+    /// holding it; the alternatives are then combined from those sets a word of nodes at a time.
+    /// A feature held by every node, or by none, settles its part of the selection outright.
+    /// On clusters of many tens of thousands of nodes the lookups are shared among threads, one
+    /// run of nodes each.
+    fn select<N: Sync>(
+        &self,
+        nodes: &[N],
+        features_of: impl Fn(&N) -> &[String] + Sync,
+        exact: bool,
+    ) -> NodeSet {
+        let len = nodes.len();
+
+        let mut named: Vec<&str> = self
+            .alternatives
+            .iter()
+            .flat_map(|alternative| alternative.features())
+            .map(String::as_str)
+            .collect();
+        named.sort_unstable();
+        named.dedup();
+
+        // as many threads as the cores allow, but no more than the nodes keep busy
+        let workers = std::thread::available_parallelism()
+            .map_or(1, usize::from)
+            .min(len / MIN_NODES_PER_WORKER);
+        let sets = look_up(&named, nodes, &features_of, exact, workers);
+
+        // a feature no node holds rules out every alternative naming it, and one every node
+        // holds rules nothing out, so each feature is sorted into one or the other once here
+        // and only the rest are ever combined
+        let mut held_by_none: HashSet<&str> = HashSet::new();
+        let mut narrowing: HashMap<&str, NodeSet> = HashMap::new();
+        for (feature, set) in named.into_iter().zip(sets) {
+            match set.count() {
+                0 => {
+                    held_by_none.insert(feature);
+                }
+                count if count == len => {}
+                _ => {
+                    narrowing.insert(feature, set);
+                }
+            }
+        }
+
+        let mut selected = NodeSet::empty(len);
+        for alternative in &self.alternatives {
+            let features = &alternative.features;
+            if features
+                .iter()
+                .any(|feature| held_by_none.contains(feature.as_str()))
+            {
+                continue;
+            }
+
+            let mut sets = features
+                .iter()
+                .filter_map(|feature| narrowing.get(feature.as_str()));
+            let Some(first) = sets.next() else {
+                // every node satisfies this alternative, so the others need not be looked at
+                return NodeSet::full(len);
+            };
+            let mut matching = first.clone();
+            for set in sets {
+                matching.intersect_with(set);
+            }
+            selected.union_with(&matching);
+        }
+        selected
+    }
 }
 
 /// Filters a collection of nodes by a feature selection.
@@ -125,11 +329,16 @@ pub fn filter_nodes_by_feature<'a>(
         all_nodes.nodes.iter().collect()
     } else {
         // --- Filtering Path: Filters were provided ---
-        // Iterate through all nodes and collect references to only those that match.
-        all_nodes
-            .nodes
+        // Evaluate the selection over every node at once, then collect references to only
+        // those that match.
+        selection
+            .select(
+                &all_nodes.nodes,
+                |node| node.features.as_slice(),
+                exact_match,
+            )
             .iter()
-            .filter(|node| selection.matches(node, exact_match))
+            .map(|index| &all_nodes.nodes[index])
             .collect()
     }
 }
@@ -208,6 +417,102 @@ mod tests {
         }
     }
 
+    fn select(args: &[&str], nodes: &[&[&str]]) -> Vec<usize> {
+        let nodes: Vec<Vec<String>> = nodes
+            .iter()
+            .map(|features| features.iter().map(|f| f.to_string()).collect())
+            .collect();
+        parse(args)
+            .select(&nodes, Vec::as_slice, true)
+            .iter()
+            .collect()
+    }
+
+    #[test]
+    fn node_set_yields_members_in_order() {
+        let mut set = NodeSet::empty(200);
+        for index in [130, 0, 63, 64, 199] {
+            set.insert(index);
+        }
+        assert_eq!(set.iter().collect::<Vec<_>>(), [0, 63, 64, 130, 199]);
+    }
+
+    #[test]
+    fn selection_combines_alternatives() {
+        let nodes: &[&[&str]] = &[
+            &["icelake", "ib"],
+            &["genoa"],
+            &["icelake", "gpu"],
+            &["skylake", "gpu"],
+        ];
+        assert_eq!(select(&["icelake"], nodes), [0, 2]);
+        assert_eq!(select(&["icelake&gpu"], nodes), [2]);
+        assert_eq!(select(&["icelake|genoa"], nodes), [0, 1, 2]);
+        assert_eq!(select(&["icelake&gpu|skylake"], nodes), [2, 3]);
+        assert!(select(&["rome"], nodes).is_empty());
+    }
+
+    #[test]
+    fn uniform_features_settle_a_selection() {
+        let nodes: &[&[&str]] = &[&["ib", "icelake"], &["ib", "genoa"], &["ib", "genoa"]];
+        assert_eq!(select(&["ib"], nodes), [0, 1, 2]);
+        assert_eq!(select(&["ib&genoa"], nodes), [1, 2]);
+        assert_eq!(select(&["rome&ib|icelake"], nodes), [0]);
+        assert_eq!(select(&["genoa|ib"], nodes), [0, 1, 2]);
+        assert!(select(&["rome&ib"], nodes).is_empty());
+    }
+
+    #[test]
+    fn a_selection_matches_substrings_unless_exact() {
+        let nodes: Vec<Vec<String>> = [&["icelake", "ib"][..], &["genoa"], &["sapphire"]]
+            .iter()
+            .map(|features| features.iter().map(|f| f.to_string()).collect())
+            .collect();
+        let matching = |args: &[&str], exact: bool| -> Vec<usize> {
+            parse(args)
+                .select(&nodes, Vec::as_slice, exact)
+                .iter()
+                .collect()
+        };
+        assert_eq!(matching(&["e"], false), [0, 1, 2]);
+        assert_eq!(matching(&["ice&i"], false), [0]);
+        assert!(matching(&["ice"], true).is_empty());
+    }
+
+    #[test]
+    fn lookups_split_across_threads_join_in_order() {
+        // 1000 nodes among 5 workers make runs of 256, the last of them partial, and a partial
+        // last word
+        let nodes: Vec<Vec<String>> = (0..1000)
+            .map(|i| {
+                let mut features = vec![format!("rack{}", i % 7)];
+                if i % 3 == 0 {
+                    features.push("gpu".to_string());
+                }
+                features
+            })
+            .collect();
+        let named = ["gpu", "rack2", "rack5", "rome"];
+        let sets = look_up(&named, &nodes, &Vec::as_slice, true, 5);
+        for (wanted, set) in named.iter().zip(&sets) {
+            let expected: Vec<usize> = (0..nodes.len())
+                .filter(|&i| holds(&nodes[i], wanted, true))
+                .collect();
+            assert_eq!(set.iter().collect::<Vec<_>>(), expected, "{wanted}");
+        }
+        assert_eq!(sets, look_up(&named, &nodes, &Vec::as_slice, true, 1));
+    }
+
+    #[test]
+    fn a_full_set_holds_exactly_its_length() {
+        for len in [0, 1, 63, 64, 65, 130] {
+            assert_eq!(
+                NodeSet::full(len).iter().collect::<Vec<_>>(),
+                (0..len).collect::<Vec<_>>()
+            );
+        }
+    }
+
     #[test]
     fn a_dangling_operator_is_refused() {
         for arg in ["icelake&", "&icelake", "icelake&&gpu", "icelake,,gpu", "|"] {
@@ -289,53 +289,67 @@ impl SlurmJobs {
         (node_use, core_use)
     }
     pub fn get_gres_total(&self) -> u32 {
-        let gres_totals: Vec<Vec<u32>> = self
-            .jobs
-            .iter()
-            .filter_map(|(_, job)| {
-                if let Some(gres) = &job.gres_total {
-                    let temp: Vec<u32> = gres
-                        .split(':')
-                        .filter_map(|g| g.parse::<u32>().ok())
-                        .collect();
-                    Some(temp)
-                } else {
-                    None
-                }
-            })
-            .collect();
-
         // have to parse them out, to get the number after the last :
-
-        gres_totals.iter().flatten().sum()
+        // summed as they are parsed, without collecting each job's counts first
+        self.jobs
+            .values()
+            .filter_map(|job| job.gres_total.as_deref())
+            .flat_map(|gres| gres.split(':').filter_map(|g| g.parse::<u32>().ok()))
+            .sum()
     }
 }
 
 /// Iterates through all loaded jobs and populates their `node_ids` vector.
-/// This is a bulk operation designed for cache efficiency.
+/// This is a bulk operation designed for cache efficiency: jobs sometimes share a hostlist, as
+/// when many small jobs are packed onto one node, so a hostlist is expanded only for the first
+/// job having it and copied from that job for the rest.
+/// Each job's `node_ids` must start empty, as a job sharing a hostlist has its list replaced.
 pub fn enrich_jobs_with_node_ids(
     slurm_jobs: &mut SlurmJobs, // Needs to be mutable to modify the jobs
     name_to_id: &HashMap<String, usize>,
 ) {
+    // the first job found with each hostlist, and each later job sharing one with it
+    let mut first_with: HashMap<&str, u32> = HashMap::new();
+    let mut repeats: Vec<(u32, u32)> = Vec::new();
+
     // We iterate mutably over the jobs vector
-    for job in &mut slurm_jobs.jobs.values_mut() {
-        if job.raw_hostlist.is_empty() {
+    for (&key, job) in slurm_jobs.jobs.iter_mut() {
+        let raw_hostlist: &str = &job.raw_hostlist;
+        if raw_hostlist.is_empty() {
             continue;
         }
 
-        // 1. Parse the hostlist string
-        let expanded_nodes = crate::parser::parse_slurm_hostlist(&job.raw_hostlist);
-
-        // 2. Convert names to IDs and populate the job's node_ids vector
-        //    Pre-allocating capacity is a small extra optimization.
-        job.node_ids.reserve(expanded_nodes.len());
-        for node_name in expanded_nodes {
-            if let Some(&id) = name_to_id.get(&node_name) {
+        // 1. A hostlist already expanded for another job is copied from it below
+        if let Some(&first) = first_with.get(raw_hostlist) {
+            repeats.push((key, first));
+            continue;
+        }
+        first_with.insert(raw_hostlist, key);
+
+        // 2. Expand the hostlist string, converting each name to its ID as it is produced
+        //    and populating the job's node_ids vector. The names are only borrowed for the
+        //    lookup, so none of them is allocated.
+        //    Pre-allocating capacity is a small extra optimization. Slurm's node count is
+        //    capped at the nodes that exist, so a bad value cannot force a huge allocation.
+        job.node_ids
+            .reserve((job.num_nodes as usize).min(name_to_id.len()));
+        crate::parser::for_each_hostname(raw_hostlist, |node_name| {
+            if let Some(&id) = name_to_id.get(node_name) {
                 job.node_ids.push(id);
             }
+        });
+    }
+
+    // 3. Give each job sharing a hostlist the node IDs of the first job with it
+    for (key, first) in repeats {
+        let node_ids = slurm_jobs.jobs[&first].node_ids.clone();
+        if let Some(job) = slurm_jobs.jobs.get_mut(&key) {
+            job.node_ids = node_ids;
         }
+    }
 
-        // 3. (Optional) Free the memory from the raw string if it's no longer needed.
+    // 4. (Optional) Free the memory from the raw strings now that they are no longer needed.
+    for job in slurm_jobs.jobs.values_mut() {
         job.raw_hostlist.clear();
         job.raw_hostlist.shrink_to_fit();
     }
@@ -587,14 +601,34 @@ pub fn print_accounts(accounts: &[AccountJobUsage], widths: &AcctUsageWidths, la
 /// Builds a map where keys are node hostnames and values are a list of job IDs
 /// running on that node
 pub fn build_node_to_job_map(slurm_jobs: &SlurmJobs) -> HashMap<usize, Vec<u32>> {
-    let mut node_to_job_map: HashMap<usize, Vec<u32>> = HashMap::new();
+    let running_jobs = || {
+        slurm_jobs
+            .jobs
+            .values()
+            .filter(|job| job.job_state == JobState::Running && !job.node_ids.is_empty())
+    };
 
-    for job in slurm_jobs.jobs.values() {
-        if job.job_state != JobState::Running || job.node_ids.is_empty() {
-            continue;
+    // A first pass counts the jobs on each node. Node ids are small indices, so the counts are
+    // kept by position rather than hashed, and let the map and every node's list be allocated
+    // once at their final size instead of growing as jobs are pushed.
+    let mut jobs_per_node: Vec<usize> = Vec::new();
+    for job in running_jobs() {
+        for &node_id in &job.node_ids {
+            if node_id >= jobs_per_node.len() {
+                jobs_per_node.resize(node_id + 1, 0);
+            }
+            jobs_per_node[node_id] += 1;
         }
+    }
+    let busy_nodes = jobs_per_node.iter().filter(|&&count| count > 0).count();
+
+    let mut node_to_job_map: HashMap<usize, Vec<u32>> = HashMap::with_capacity(busy_nodes);
+    for job in running_jobs() {
         for &node_id in &job.node_ids {
-            node_to_job_map.entry(node_id).or_default().push(job.job_id);
+            node_to_job_map
+                .entry(node_id)
+                .or_insert_with(|| Vec::with_capacity(jobs_per_node[node_id]))
+                .push(job.job_id);
         }
     }
     node_to_job_map
@@ -129,20 +129,11 @@ impl From<u32> for NodeState {
 
         let flags_struct = NodeStateFlags::from_bits_truncate(state_num);
 
+        // the names come straight from the table bitflags generates, e.g. "DRAIN", rather than
+        // being cut back out of each flag's Debug output
         let flags: Vec<String> = flags_struct
-            .iter()
-            .map(|flag| {
-                // Get the verbose debug string, e.g., "NodeStateFlags(DRAIN | MAINT)"
-                let debug_str = format!("{:?}", flag);
-                // Extract just the name, e.g., "DRAIN"
-                if let Some(start) = debug_str.find('(')
-                    && let Some(end) = debug_str.rfind(')')
-                {
-                    return debug_str[start + 1..end].to_string();
-                }
-                // Fallback for simple flags that might not have parentheses
-                debug_str
-            })
+            .iter_names()
+            .map(|(name, _)| name.to_string())
             .collect();
 
         if flags.is_empty() {
@@ -184,50 +175,31 @@ pub struct GpuInfo {
 }
 
 /// Parses gres and gres_used strings to create an optional GpuInfo struct
-fn create_gpu_info(gres_str_ptr: *const i8, gres_used_ptr: *const i8) -> Option<GpuInfo> {
-    /// A robust, local helper function to parse GRES strings
-    fn parse_local_gres(raw_ptr: *const i8) -> HashMap<String, u64> {
-        if raw_ptr.is_null() {
-            return HashMap::new();
-        }
-        let gres_str = unsafe { CStr::from_ptr(raw_ptr) }.to_string_lossy();
-
-        gres_str
-            .split(',')
-            .filter_map(|entry| {
-                // First, strip off any parenthesized metadata like (IDX:...)
-                let main_part = entry.split('(').next().unwrap_or(entry).trim();
-
-                // Now, split the remaining "name:count" part.
-                if let Some((key, count_str)) = main_part.rsplit_once(':') {
-                    if let Ok(value) = count_str.parse::<u64>() {
-                        Some((key.to_string(), value))
-                    } else {
-                        None
-                    }
-                } else {
-                    None
-                }
-            })
-            .collect()
+fn create_gpu_info(gres_str: &str, gres_used_str: &str) -> Option<GpuInfo> {
+    /// A robust, local helper yielding the (name, count) of each entry in a GRES string,
+    /// e.g. "gpu:h100:8(S:0-1)" -> ("gpu:h100", 8), parsed in place rather than collected
+    fn gres_entries(gres_str: &str) -> impl Iterator<Item = (&str, u64)> {
+        gres_str.split(',').filter_map(|entry| {
+            // First, strip off any parenthesized metadata like (IDX:...)
+            let main_part = entry.split('(').next().unwrap_or(entry).trim();
+
+            // Now, split the remaining "name:count" part.
+            let (key, count_str) = main_part.rsplit_once(':')?;
+            count_str.parse::<u64>().ok().map(|value| (key, value))
+        })
     }
 
-    let configured_map = parse_local_gres(gres_str_ptr);
-    let allocated_map = parse_local_gres(gres_used_ptr);
-
-    // Find the first (and likely only) GRES key that represents a GPU
-    let gpu_key = configured_map
-        .keys()
-        .find(|key| key.starts_with("gpu"))
-        .cloned()?; // Clone the key so we can use it for lookups
+    // Find the first (and likely only) GRES entry that represents a GPU
+    let (gpu_key, total_gpus) = gres_entries(gres_str).find(|(key, _)| key.starts_with("gpu"))?;
 
-    let total_gpus = *configured_map.get(&gpu_key).unwrap_or(&0);
-    let allocated_gpus = *allocated_map.get(&gpu_key).unwrap_or(&0);
+    let allocated_gpus = gres_entries(gres_used_str)
+        .find(|(key, _)| *key == gpu_key)
+        .map_or(0, |(_, count)| count);
 
     // Only create a GpuInfo struct if there are actually GPUs configured
     if total_gpus > 0 {
         Some(GpuInfo {
-            name: gpu_key,
+            name: gpu_key.to_string(),
             total_gpus,
             allocated_gpus,
         })
@@ -349,6 +321,12 @@ impl Node {
             NodeState::from(raw_node.next_state)
         };
 
+        // converted once here, since the GPU summary is parsed from the same strings that
+        // are kept for reference
+        let gres = unsafe { c_str_to_string(raw_node.gres) };
+        let gres_used = unsafe { c_str_to_string(raw_node.gres_used) };
+        let os = unsafe { c_str_to_string(raw_node.os) };
+
         Ok(Node {
             id,
             // Basic identification
@@ -379,10 +357,10 @@ impl Node {
             active_features: c_str_to_vec(raw_node.features_act),
 
             // Generic Resources (GRES)
-            gpu_info: create_gpu_info(raw_node.gres, raw_node.gres_used),
-            gres: unsafe { c_str_to_string(raw_node.gres) }, // Keep the raw string for reference
+            gpu_info: create_gpu_info(&gres, &gres_used),
+            gres, // Keep the raw string for reference
             gres_drain: unsafe { c_str_to_string(raw_node.gres_drain) },
-            gres_used: unsafe { c_str_to_string(raw_node.gres_used) }, // Keep the raw string for reference
+            gres_used, // Keep the raw string for reference
             res_cores_per_gpu: raw_node.res_cores_per_gpu,
             gpu_spec: "TODO: Implement gpu_spec parsing".to_string(), // Placeholder
 
@@ -395,7 +373,7 @@ impl Node {
 
             // Other
             architecture: unsafe { c_str_to_string(raw_node.arch) },
-            operating_system: unsafe { c_str_to_string(raw_node.os) },
+            operating_system: os.clone(),
             reason: unsafe { c_str_to_string(raw_node.reason) },
             broadcast_address: unsafe { c_str_to_string(raw_node.bcast_address) },
             boards: raw_node.boards,
@@ -405,7 +383,7 @@ impl Node {
             instance_id: "TODO".to_string(), // These fields may not have direct mappings
             instance_type: "TODO".to_string(),
             mcs_label: unsafe { c_str_to_string(raw_node.mcs_label) },
-            os: unsafe { c_str_to_string(raw_node.os) }, // Duplicate of operating_system? Included for completeness.
+            os, // Duplicate of operating_system? Included for completeness.
             owner: raw_node.owner,
             partitions: unsafe { c_str_to_string(raw_node.partitions) },
             port: raw_node.port,
@@ -1,5 +1,6 @@
 use std::collections::HashMap;
 use std::ffi::CStr;
+use std::fmt::Write;
 use std::sync::OnceLock;
 
 use regex::Regex;
@@ -23,42 +24,26 @@ use regex::Regex;
 ///
 /// A `Vec<String>` containing all the individual, expanded hostnames
 pub fn parse_slurm_hostlist(hostlist_str: &str) -> Vec<String> {
+    let mut expanded_nodes = Vec::new();
+    for_each_hostname(hostlist_str, |name| expanded_nodes.push(name.to_string()));
+    expanded_nodes
+}
+
+/// Expands a Slurm hostlist string as `parse_slurm_hostlist` does, but hands each hostname
+/// to `visit` instead of collecting them
+///
+/// The names are built in one reused buffer, so a caller that only needs to look each name up
+/// pays for no allocation per host.
+pub fn for_each_hostname(hostlist_str: &str, mut visit: impl FnMut(&str)) {
     static RE: OnceLock<Regex> = OnceLock::new();
     let re = RE.get_or_init(|| {
         Regex::new(r"^(.*)\[([^\]]+)\](.*)$").expect("Failed to compile hostlist regex")
     });
 
-    let mut expanded_nodes = Vec::new();
-    let mut expressions = Vec::new();
-    let mut current_expression = String::new();
-    let mut bracket_level = 0;
-
-    // This loop correctly separates expressions like "node[01-02],login01"
-    // by respecting brackets
-    for ch in hostlist_str.chars() {
-        match ch {
-            '[' => bracket_level += 1,
-            ']' => bracket_level -= 1,
-            ',' if bracket_level == 0 => {
-                // We found a top-level comma separator.
-                if !current_expression.is_empty() {
-                    expressions.push(current_expression.trim().to_string());
-                    current_expression.clear();
-                }
-                continue; // Skip adding the comma to the expression
-            }
-            _ => {}
-        }
-        current_expression.push(ch);
-    }
-    // Add the last expression to the list
-    if !current_expression.is_empty() {
-        expressions.push(current_expression.trim().to_string());
-    }
-
-    for part in expressions {
+    let mut name = String::new();
+    let mut expand = |part: &str| {
         // For each part, check if it matches our ranged expression regex
-        if let Some(captures) = re.captures(&part) {
+        if let Some(captures) = re.captures(part) {
             // It's a ranged expression like "prefix[ranges]suffix"
             let prefix = captures.get(1).map_or("", |m| m.as_str());
             let range_list = captures.get(2).map_or("", |m| m.as_str());
@@ -75,29 +60,52 @@ pub fn parse_slurm_hostlist(hostlist_str: &str) -> Vec<String> {
                         let width = start_str.len();
                         for i in start..=end {
                             // Format the number with leading zeros to match the width
-                            expanded_nodes.push(format!(
-                                "{}{:0width$}{}",
-                                prefix,
-                                i,
-                                suffix,
-                                width = width
-                            ));
+                            name.clear();
+                            let _ =
+                                write!(name, "{}{:0width$}{}", prefix, i, suffix, width = width);
+                            visit(&name);
                         }
                     }
                     // Ignore invalid ranges where start > end
                 } else {
                     // It's a single number like "07"
-                    expanded_nodes.push(format!("{}{}{}", prefix, range_spec, suffix));
+                    name.clear();
+                    let _ = write!(name, "{}{}{}", prefix, range_spec, suffix);
+                    visit(&name);
                 }
             }
         } else {
             // It's a simple hostname, not a ranged expression.
             if !part.is_empty() {
-                expanded_nodes.push(part.to_string());
+                visit(part);
             }
         }
+    };
+
+    // This loop correctly separates expressions like "node[01-02],login01"
+    // by respecting brackets
+    let mut bracket_level = 0;
+    let mut expression_start = 0;
+    for (i, ch) in hostlist_str.char_indices() {
+        match ch {
+            '[' => bracket_level += 1,
+            ']' => bracket_level -= 1,
+            ',' if bracket_level == 0 => {
+                // We found a top-level comma separator.
+                let expression = &hostlist_str[expression_start..i];
+                if !expression.is_empty() {
+                    expand(expression.trim());
+                }
+                expression_start = i + 1; // Skip the comma itself
+            }
+            _ => {}
+        }
+    }
+    // Expand the last expression
+    let expression = &hostlist_str[expression_start..];
+    if !expression.is_empty() {
+        expand(expression.trim());
     }
-    expanded_nodes
 }
 
 /// Compresses a vector of hostnames into a compact Slurm hostlist string.
@@ -112,18 +120,19 @@ pub fn compress_hostlist(nodes: &[String]) -> String {
         Regex::new(r"^(\D*)(\d+)(\D*)$").expect("Failed to compile compression regex")
     });
 
-    // A map to group nodes by their (prefix, suffix) pair.
+    // A map to group nodes by their (prefix, suffix) pair, borrowed from the names themselves
+    // so that grouping allocates nothing per node.
     // The key is (prefix, suffix).
     // The value is a vector of (number, padding_width) tuples.
-    let mut groups: HashMap<(String, String), Vec<(u32, usize)>> = HashMap::new();
-    // A list to hold node names that don't fit the numeric pattern (e.g., "login").
-    let mut standalone_nodes: Vec<String> = Vec::new();
+    let mut groups: HashMap<(&str, &str), Vec<(u32, usize)>> = HashMap::new();
+    // Node names that don't fit the numeric pattern (e.g., "login") go straight to the output.
+    let mut compressed_parts: Vec<String> = Vec::new();
 
     for node_name in nodes {
         if let Some(caps) = re.captures(node_name) {
-            let prefix = caps.get(1).map_or("", |m| m.as_str()).to_string();
+            let prefix = caps.get(1).map_or("", |m| m.as_str());
             let number_str = caps.get(2).map_or("", |m| m.as_str());
-            let suffix = caps.get(3).map_or("", |m| m.as_str()).to_string();
+            let suffix = caps.get(3).map_or("", |m| m.as_str());
 
             if let Ok(number) = number_str.parse::<u32>() {
                 let padding = number_str.len();
@@ -131,42 +140,27 @@ pub fn compress_hostlist(nodes: &[String]) -> String {
                     .entry((prefix, suffix))
                     .or_default()
                     .push((number, padding));
-            } else {
-                standalone_nodes.push(node_name.clone());
+                continue;
             }
-        } else {
-            standalone_nodes.push(node_name.clone());
-        }
-    }
-
-    // --- FIX: Re-classify single-node groups as standalone nodes ---
-    // This prevents a single node like "login01" from being formatted as "login[01]".
-    // We collect the keys of groups to modify first to avoid borrowing issues with the map.
-    let single_node_group_keys: Vec<_> = groups
-        .iter()
-        .filter(|(_, numbers)| numbers.len() == 1)
-        .map(|(key, _)| key.clone())
-        .collect();
-
-    for key in single_node_group_keys {
-        if let Some(numbers) = groups.remove(&key) {
-            let (prefix, suffix) = key;
-            let (number, padding) = numbers[0];
-            // Reconstruct the original node name and add it to the standalone list.
-            // THIS LINE IS FIXED: Added `suffix` to the format arguments.
-            let original_name = format!("{}{:0width$}{}", prefix, number, suffix, width = padding);
-            standalone_nodes.push(original_name);
         }
+        compressed_parts.push(node_name.clone());
     }
-    // --- End of FIX ---
-
-    let mut compressed_parts: Vec<String> = standalone_nodes;
 
     for ((prefix, suffix), mut numbers) in groups {
-        // Sort numbers to make finding consecutive ranges easy.
+        // Sort numbers to make finding consecutive ranges easy. A name listed more than once
+        // is written once.
         numbers.sort();
-
-        if numbers.is_empty() {
+        numbers.dedup();
+
+        // A single node like "login01" is written as itself rather than as "login[01]".
+        if let [(number, padding)] = numbers[..] {
+            compressed_parts.push(format!(
+                "{}{:0width$}{}",
+                prefix,
+                number,
+                suffix,
+                width = padding
+            ));
             continue;
         }
 
@@ -438,6 +432,14 @@ mod tests {
         assert_eq!(compress_hostlist(&nodes), "n[1-2,03-04]");
     }
 
+    #[test]
+    fn test_compress_duplicate_names() {
+        let nodes = vec!["n01".to_string(), "n02".to_string(), "n01".to_string()];
+        assert_eq!(compress_hostlist(&nodes), "n[01-02]");
+        let nodes = vec!["login01".to_string(), "login01".to_string()];
+        assert_eq!(compress_hostlist(&nodes), "login01");
+    }
+
     #[test]
     fn test_simple_tres_string() {
         let input_str = "cpu=512,mem=4000G,node=4,billing=512";